@@ -5,14 +5,29 @@ Monitors RSS feeds and sends notifications for new posts
 """
 
 import logging
-import json
 import os
+import re
 import asyncio
+import atexit
+import calendar
+import functools
+import hashlib
+import heapq
+import html
+import mmap
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Set
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import aiohttp
 import feedparser
+import orjson
+import xxhash
 from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes
+from telegram.ext import AIORateLimiter, Application, CommandHandler, ContextTypes
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -32,17 +47,127 @@ if not BOT_TOKEN:
 
 DATA_FILE = os.getenv("DATA_FILE", "rss_bot_data.json")
 CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL", "300"))  # Check every 5 minutes (in seconds)
+CHECK_JITTER = 0.15  # Each interval varies randomly by up to ±15%
+FETCH_TIMEOUT = int(os.getenv("FETCH_TIMEOUT", "30"))  # Per-feed HTTP timeout (in seconds)
+USER_AGENT = "rss_telegrambot (+https://github.com/JevonThompsonx/rss_telegrambot)"
+MAX_CONCURRENT_FETCHES = int(os.getenv("MAX_CONCURRENT_FETCHES", "8"))  # Feeds downloaded at once
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "8"))  # Threads used to parse feeds
+SAVE_INTERVAL = int(os.getenv("SAVE_INTERVAL", "30"))  # Flush pending changes at most this often (in seconds)
+SEEN_POSTS_LIMIT = int(os.getenv("SEEN_POSTS_LIMIT", "500"))  # Post IDs remembered per feed
+
+def post_key(post_id: str) -> int:
+    """Hash a post ID to the 64-bit integer stored in seen post records"""
+    return xxhash.xxh64_intdigest(post_id)
+
+class SeenPosts:
+    """Most recent post IDs of a feed, bounded in size
+
+    A deque keeps insertion order so the oldest ID can be evicted, and a set
+    mirrors its contents for O(1) membership checks.
+    """
+
+    def __init__(self, ids: Iterable[int] = (), maxlen: int = SEEN_POSTS_LIMIT):
+        # dict.fromkeys drops duplicate IDs while keeping their order
+        self._order = deque(dict.fromkeys(ids), maxlen=maxlen)
+        self._ids: Set[int] = set(self._order)
+
+    def __contains__(self, post_id) -> bool:
+        return post_id in self._ids
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, post_id: int):
+        """Record a post ID, evicting the oldest one when full"""
+        if post_id in self._ids:
+            return
+        if len(self._order) == self._order.maxlen:
+            self._ids.discard(self._order[0])
+        self._order.append(post_id)
+        self._ids.add(post_id)
+
+    @staticmethod
+    def capacity(feed_size: int) -> int:
+        """Size needed for a feed listing feed_size entries: at least twice that"""
+        return max(SEEN_POSTS_LIMIT, 2 * feed_size)
+
+    @classmethod
+    def for_feed(cls, ids: List[int]) -> 'SeenPosts':
+        """Create a record holding every ID currently listed in a feed"""
+        return cls(ids, maxlen=cls.capacity(len(ids)))
+
+    @classmethod
+    def from_saved(cls, ids: List) -> 'SeenPosts':
+        """Rebuild a record from the IDs saved in the data file
+
+        Saved records are already sized for their feed and keep that size.
+        Histories of string IDs written by older versions are hashed and kept
+        whole: they are not in publication order, so trimming them by position
+        could drop IDs still listed in the feed. Doubling their size leaves
+        room for as many new posts as the whole history before the oldest
+        entries are evicted.
+        """
+        if ids and isinstance(ids[0], str):
+            return cls((post_key(post_id) for post_id in ids), maxlen=max(SEEN_POSTS_LIMIT, 2 * len(ids)))
+        return cls(ids, maxlen=max(SEEN_POSTS_LIMIT, len(ids)))
+
+    def fit(self, feed_size: int):
+        """Grow to hold at least twice the feed's current number of entries
+
+        IDs still listed in the feed must never be evicted, or they would be
+        reported as new again on the next check. The record never shrinks, as
+        a short response (e.g. a partial feed) says nothing about the next one.
+        """
+        maxlen = self.capacity(feed_size)
+        if maxlen > self._order.maxlen:
+            self._order = deque(self._order, maxlen=maxlen)
+
+def encode_default(obj):
+    """orjson hook writing sets and seen post records as JSON arrays"""
+    if isinstance(obj, (set, SeenPosts)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 class RSSBot:
     def __init__(self):
         self.data = self.load_data()
+        # Set when data changed since the last save
+        self._dirty = False
+        # Serializes writers of the data file
+        self._save_lock = threading.Lock()
+        # Shared HTTP session, created once the event loop is running
+        self.session: Optional[aiohttp.ClientSession] = None
+        # Bounds the number of feeds downloaded at once, created with the session
+        self._fetch_semaphore: Optional[asyncio.Semaphore] = None
+        # Feeds are parsed in these threads so parsing never blocks the event loop
+        self._parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="feedparse")
+        # HTTP cache validators per feed, sent back on conditional requests
+        self._etag: Dict[str, str] = {}
+        self._modified: Dict[str, str] = {}
+        # Digest of the last parsed body per feed, for servers ignoring validators
+        self._digest: Dict[str, bytes] = {}
+        # Digest and validators of fetched feeds whose posts are not handled yet
+        self._pending: Dict[str, Tuple[bytes, Optional[str], Optional[str]]] = {}
 
     def load_data(self) -> Dict:
         """Load bot data from JSON file"""
         if os.path.exists(DATA_FILE):
             try:
-                with open(DATA_FILE, 'r') as f:
-                    return json.load(f)
+                # Parse straight from a memory map of the file, without first
+                # copying it into a bytes object
+                with open(DATA_FILE, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                        memoryview(mm) as view:
+                    data = orjson.loads(view)
+                # Keep IDs in sets in memory for O(1) membership checks
+                data['seen_posts'] = {
+                    url: SeenPosts.from_saved(ids) for url, ids in data['seen_posts'].items()
+                }
+                data['chat_ids'] = set(data['chat_ids'])
+                return data
             except Exception as e:
                 logger.error(f"Error loading data: {e}")
 
@@ -50,40 +175,275 @@ class RSSBot:
         return {
             "feeds": ["https://status.aws.amazon.com/rss/multipleservices-us-east-1.rss"],
             "seen_posts": {},
-            "chat_ids": []
+            "chat_ids": set()
         }
 
-    def save_data(self):
-        """Save bot data to JSON file"""
+    def encode_data(self) -> Optional[bytes]:
+        """Serialize bot data to JSON, or return None on failure"""
         try:
-            with open(DATA_FILE, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            # Compact output without sorted keys, so encoding stays in orjson's
+            # fast path; only sets and seen post records reach the hook
+            return orjson.dumps(self.data, default=encode_default)
         except Exception as e:
-            logger.error(f"Error saving data: {e}")
+            logger.error(f"Error encoding data: {e}")
+            return None
+
+    def write_data(self, data_bytes: bytes) -> bool:
+        """Write serialized bot data to the JSON file, returning True on success"""
+        tmp_file = DATA_FILE + '.tmp'
+        with self._save_lock:
+            try:
+                # Write to a temporary file first and swap it in atomically, so
+                # readers never see a half-written data file
+                with open(tmp_file, 'wb') as f:
+                    f.write(data_bytes)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, DATA_FILE)
+                return True
+            except Exception as e:
+                logger.error(f"Error saving data: {e}")
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+                return False
+
+    def save_data(self):
+        """Save bot data to JSON file"""
+        data_bytes = self.encode_data()
+        if data_bytes is not None and self.write_data(data_bytes):
+            self._dirty = False
+
+    async def save_data_async(self):
+        """Save bot data to JSON file without blocking the event loop
+
+        The data is serialized on the event loop, so the snapshot is
+        consistent, and only the file write runs in a worker thread.
+        """
+        data_bytes = self.encode_data()
+        if data_bytes is None:
+            return
+
+        # Changes made while the file is being written mark the data dirty again
+        self._dirty = False
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self.write_data, data_bytes):
+            self._dirty = True
+
+    def mark_dirty(self):
+        """Schedule the data to be saved on the next flush"""
+        self._dirty = True
+
+    def flush_if_dirty(self):
+        """Save bot data if it changed since the last save"""
+        if self._dirty:
+            self.save_data()
+
+    async def flush_if_dirty_async(self):
+        """Save bot data in the background if it changed since the last save"""
+        if self._dirty:
+            await self.save_data_async()
+
+    async def open_session(self):
+        """Create the HTTP session shared by all feed fetches
+
+        Connections are pooled and kept alive between checks, so feeds from
+        the same host reuse one TLS connection.
+        """
+        self._fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=4,
+            ttl_dns_cache=CHECK_INTERVAL,
+            # Outlast the longest jittered gap between two checks
+            keepalive_timeout=CHECK_INTERVAL * (1 + CHECK_JITTER) + 30
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT),
+            headers={
+                'User-Agent': USER_AGENT,
+                'Accept': 'application/rss+xml, application/atom+xml, application/xml;q=0.9, */*;q=0.8',
+            }
+        )
+
+    async def close_session(self):
+        """Close the shared HTTP session and the parser threads"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self._parse_executor.shutdown(wait=False)
+
+    def forget_feed(self, feed_url: str):
+        """Drop the cached HTTP state of a feed"""
+        self._etag.pop(feed_url, None)
+        self._modified.pop(feed_url, None)
+        self._digest.pop(feed_url, None)
+        self._pending.pop(feed_url, None)
+
+    def commit_feed(self, feed_url: str):
+        """Remember the last conditional fetch of a feed as handled
+
+        Called once all its posts were processed, so a check that fails
+        halfway fetches and parses the feed again next time.
+        """
+        pending = self._pending.pop(feed_url, None)
+        if pending is None:
+            return
+        digest, etag, modified = pending
+        self._digest[feed_url] = digest
+        if etag:
+            self._etag[feed_url] = etag
+        if modified:
+            self._modified[feed_url] = modified
+
+    async def fetch_feed(self, feed_url: str, conditional: bool = False,
+                         limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """Fetch and parse RSS feed
+
+        With conditional=True the stored ETag/Last-Modified validators are sent,
+        and None is returned when the feed is unchanged since the last
+        conditional fetch, without parsing it again. The new validators only
+        take effect once the caller commits them with commit_feed. With limit
+        only the first entries of the feed are returned.
+        """
+        headers = {}
+        if conditional:
+            if feed_url in self._etag:
+                headers['If-None-Match'] = self._etag[feed_url]
+            if feed_url in self._modified:
+                headers['If-Modified-Since'] = self._modified[feed_url]
 
-    def get_feed_posts(self, feed_url: str) -> List[Dict]:
-        """Fetch and parse RSS feed"""
         try:
-            feed = feedparser.parse(feed_url)
+            async with self._fetch_semaphore, self.session.get(feed_url, headers=headers) as response:
+                if response.status == 304:
+                    return None
+                response.raise_for_status()
+                content = await response.read()
+                response_headers = {
+                    'content-location': feed_url,
+                    'content-type': response.headers.get('Content-Type', ''),
+                }
+                etag = response.headers.get('ETag')
+                modified = response.headers.get('Last-Modified')
+
+            digest = hashlib.sha1(content).digest()
+            if conditional and self._digest.get(feed_url) == digest:
+                return None
+
+            # Parsing is CPU-bound, keep it off the event loop
+            loop = asyncio.get_running_loop()
+            feed = await loop.run_in_executor(
+                self._parse_executor,
+                functools.partial(feedparser.parse, content, response_headers=response_headers)
+            )
             posts = []
 
-            for entry in feed.entries:
+            for entry in feed.entries[:limit]:
+                # Publication time as a UTC timestamp, 0 when the feed has none
+                published_parsed = entry.get('published_parsed') or entry.get('updated_parsed')
                 post = {
                     'title': entry.get('title', 'No title'),
                     'link': entry.get('link', ''),
                     'published': entry.get('published', ''),
                     'summary': entry.get('summary', entry.get('description', '')),
-                    'id': entry.get('id', entry.get('link', ''))
+                    'id': entry.get('id', entry.get('link', '')),
+                    'ts': calendar.timegm(published_parsed) if published_parsed else 0
                 }
                 posts.append(post)
 
+            # Only remember validators for checks, so that a one-off fetch
+            # (e.g. /list) can't hide new posts from the next check
+            if conditional:
+                self._pending[feed_url] = (digest, etag, modified)
+
             return posts
         except Exception as e:
             logger.error(f"Error fetching feed {feed_url}: {e}")
             return []
 
+    async def fetch_all(self, feed_urls: List[str]) -> List[Optional[List[Dict]]]:
+        """Fetch several feeds concurrently, returning posts in feed order
+
+        Unchanged feeds are reported as None, like fetch_feed.
+        """
+        results = await asyncio.gather(
+            *(self.fetch_feed(feed_url, conditional=True) for feed_url in feed_urls),
+            return_exceptions=True
+        )
+
+        feeds_posts = []
+        for feed_url, result in zip(feed_urls, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching feed {feed_url}: {result}")
+                result = []
+            feeds_posts.append(result)
+        return feeds_posts
+
 # Initialize bot
 rss_bot = RSSBot()
+atexit.register(rss_bot.flush_if_dirty)
+
+_BLOCK_TAG_RE = re.compile(r'<\s*/?\s*(?:br|p|div|li|ul|ol|h[1-6]|blockquote|tr|hr)\b[^>]*>', re.I)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'[ \t\r\f\v\xa0]+')
+_NEWLINE_RE = re.compile(r' ?\n[ \n]*')
+
+def _plain_text(markup: str) -> str:
+    """Convert HTML to readable plain text
+
+    Line breaks and block tags become newlines and other tags become spaces,
+    so words on either side of a tag stay apart; whitespace is then collapsed.
+    Tags are removed before unescaping, so escaped angle brackets are kept.
+    """
+    text = _TAG_RE.sub(' ', _BLOCK_TAG_RE.sub('\n', markup))
+    text = _SPACE_RE.sub(' ', html.unescape(text))
+    return _NEWLINE_RE.sub('\n', text).strip()
+
+def _trunc(text: str, limit: int = 500) -> str:
+    """Truncate text to limit characters, marking the cut with an ellipsis"""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+_POST_TEMPLATE = "🔔 New Post Alert!\n\n📰 {title}\n\n🔗 {link}\n\n{published}{summary}"
+
+def format_post(post: Dict) -> str:
+    """Format the notification message for a new post"""
+    published = f"📅 {post['published']}\n\n" if post['published'] else ""
+    # Messages are sent as plain text, so drop markup from the summary
+    summary = _trunc(_plain_text(post['summary'])) if post['summary'] else ""
+
+    return _POST_TEMPLATE.format_map({
+        'title': post['title'],
+        'link': post['link'],
+        'published': published,
+        'summary': summary,
+    })
+
+def chunk_blocks(blocks: List[str], limit: int = 3500) -> List[str]:
+    """Join text blocks into messages of at most limit characters
+
+    Messages are only split between blocks; a single block longer than the
+    limit is split on its own.
+    """
+    chunks = []
+    current: List[str] = []
+    current_len = 0
+
+    for block in blocks:
+        if current and current_len + len(block) > limit:
+            chunks.append("".join(current))
+            current = []
+            current_len = 0
+        while len(block) > limit:
+            chunks.append(block[:limit])
+            block = block[limit:]
+        current.append(block)
+        current_len += len(block)
+
+    if current:
+        chunks.append("".join(current))
+    return chunks
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send a message when the command /start is issued"""
@@ -91,8 +451,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Add chat_id to list if not already present
     if chat_id not in rss_bot.data['chat_ids']:
-        rss_bot.data['chat_ids'].append(chat_id)
-        rss_bot.save_data()
+        rss_bot.data['chat_ids'].add(chat_id)
+        rss_bot.mark_dirty()
 
     message = (
         "Welcome to RSS Feed Monitor Bot!\n\n"
@@ -134,7 +494,7 @@ async def add_feed(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Try to fetch the feed to validate it
     await update.message.reply_text("Validating RSS feed...")
-    posts = rss_bot.get_feed_posts(feed_url)
+    posts = await rss_bot.fetch_feed(feed_url)
 
     if not posts:
         await update.message.reply_text("Could not fetch the RSS feed. Please check the URL and try again.")
@@ -142,14 +502,11 @@ async def add_feed(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Add feed
     rss_bot.data['feeds'].append(feed_url)
-    rss_bot.data['seen_posts'][feed_url] = []
 
     # Mark existing posts as seen to avoid spam
-    for post in posts:
-        if post['id'] not in rss_bot.data['seen_posts'][feed_url]:
-            rss_bot.data['seen_posts'][feed_url].append(post['id'])
+    rss_bot.data['seen_posts'][feed_url] = SeenPosts.for_feed([post_key(post['id']) for post in posts])
 
-    rss_bot.save_data()
+    rss_bot.mark_dirty()
 
     await update.message.reply_text(
         f"Successfully added feed!\n"
@@ -175,8 +532,9 @@ async def remove_feed(update: Update, context: ContextTypes.DEFAULT_TYPE):
     rss_bot.data['feeds'].remove(feed_url)
     if feed_url in rss_bot.data['seen_posts']:
         del rss_bot.data['seen_posts'][feed_url]
+    rss_bot.forget_feed(feed_url)
 
-    rss_bot.save_data()
+    rss_bot.mark_dirty()
     await update.message.reply_text(f"Removed feed: {feed_url}")
 
 async def check_feeds(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -184,40 +542,39 @@ async def check_feeds(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Checking feeds for updates...")
 
     new_posts_found = 0
-
-    for feed_url in rss_bot.data['feeds']:
-        posts = rss_bot.get_feed_posts(feed_url)
+    seen_posts = rss_bot.data['seen_posts']
+    reply = update.message.reply_text
+
+    feed_urls = list(rss_bot.data['feeds'])
+    for feed_url, posts in zip(feed_urls, await rss_bot.fetch_all(feed_urls)):
+        if feed_url not in rss_bot.data['feeds']:
+            # Feed removed while it was being fetched
+            rss_bot.forget_feed(feed_url)
+            continue
+        if posts is None:
+            # Feed unchanged since the last check
+            continue
 
         # Initialize seen_posts for this feed if not exists
-        if feed_url not in rss_bot.data['seen_posts']:
-            rss_bot.data['seen_posts'][feed_url] = []
+        seen = seen_posts.setdefault(feed_url, SeenPosts())
+        if posts:
+            seen.fit(len(posts))
+        seen_add = seen.add
 
         for post in posts:
-            if post['id'] not in rss_bot.data['seen_posts'][feed_url]:
+            post_id = post_key(post['id'])
+            if post_id not in seen:
                 # New post found
-                rss_bot.data['seen_posts'][feed_url].append(post['id'])
+                seen_add(post_id)
+                rss_bot.mark_dirty()
                 new_posts_found += 1
 
-                # Format and send notification
-                message = (
-                    f"🔔 New Post Alert!\n\n"
-                    f"📰 {post['title']}\n\n"
-                    f"🔗 {post['link']}\n\n"
-                )
-
-                if post['published']:
-                    message += f"📅 {post['published']}\n\n"
-
-                if post['summary']:
-                    # Truncate summary if too long
-                    summary = post['summary'][:500]
-                    if len(post['summary']) > 500:
-                        summary += "..."
-                    message += f"{summary}"
+                try:
+                    await reply(format_post(post))
+                except Exception as e:
+                    logger.error(f"Error sending message to {update.effective_chat.id}: {e}")
 
-                await update.message.reply_text(message)
-
-    rss_bot.save_data()
+        rss_bot.commit_feed(feed_url)
 
     if new_posts_found == 0:
         await update.message.reply_text("No new posts found.")
@@ -234,9 +591,12 @@ async def list_posts(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     all_posts = []
 
-    for feed_url in rss_bot.data['feeds']:
-        posts = rss_bot.get_feed_posts(feed_url)
-        for post in posts[:10]:  # Get up to 10 posts per feed
+    feed_urls = list(rss_bot.data['feeds'])
+    # Get up to 10 posts per feed
+    results = await asyncio.gather(*(rss_bot.fetch_feed(feed_url, limit=10) for feed_url in feed_urls))
+
+    for feed_url, posts in zip(feed_urls, results):
+        for post in posts:
             post['feed_url'] = feed_url
             all_posts.append(post)
 
@@ -244,71 +604,101 @@ async def list_posts(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("No posts found in any feed.")
         return
 
-    # Show last 10 posts
-    all_posts = all_posts[:10]
+    # Show the 10 most recent posts across all feeds
+    all_posts = heapq.nlargest(10, all_posts, key=itemgetter('ts'))
 
-    message = "📋 Last 10 Posts:\n\n"
+    blocks = ["📋 Last 10 Posts:\n\n"]
 
     for i, post in enumerate(all_posts, 1):
-        message += f"{i}. {post['title']}\n"
-        message += f"   🔗 {post['link']}\n"
-        if post['published']:
-            message += f"   📅 {post['published']}\n"
-        message += "\n"
-
-    # Telegram has a message length limit, so split if needed
-    if len(message) > 4000:
-        for i in range(0, len(message), 4000):
-            await update.message.reply_text(message[i:i+4000])
-    else:
-        await update.message.reply_text(message)
+        published = f"   📅 {post['published']}\n" if post['published'] else ""
+        blocks.append(f"{i}. {post['title']}\n   🔗 {post['link']}\n{published}\n")
+
+    # Telegram has a message length limit, so split between posts if needed.
+    # Chunks are sent in order, the rate limiter paces them.
+    for chunk in chunk_blocks(blocks):
+        await update.message.reply_text(chunk)
 
 async def check_feeds_periodic(context: ContextTypes.DEFAULT_TYPE):
     """Periodically check all feeds for new posts"""
     logger.info("Running periodic feed check...")
 
-    for feed_url in rss_bot.data['feeds']:
-        posts = rss_bot.get_feed_posts(feed_url)
+    seen_posts = rss_bot.data['seen_posts']
+    send = context.bot.send_message
+
+    feed_urls = list(rss_bot.data['feeds'])
+    for feed_url, posts in zip(feed_urls, await rss_bot.fetch_all(feed_urls)):
+        if feed_url not in rss_bot.data['feeds']:
+            # Feed removed while it was being fetched
+            rss_bot.forget_feed(feed_url)
+            continue
+        if posts is None:
+            # Feed unchanged since the last check
+            continue
 
         # Initialize seen_posts for this feed if not exists
-        if feed_url not in rss_bot.data['seen_posts']:
-            rss_bot.data['seen_posts'][feed_url] = []
+        seen = seen_posts.setdefault(feed_url, SeenPosts())
+        if posts:
+            seen.fit(len(posts))
+        seen_add = seen.add
 
         for post in posts:
-            if post['id'] not in rss_bot.data['seen_posts'][feed_url]:
+            post_id = post_key(post['id'])
+            if post_id not in seen:
                 # New post found
-                rss_bot.data['seen_posts'][feed_url].append(post['id'])
-
-                # Format notification message
-                message = (
-                    f"🔔 New Post Alert!\n\n"
-                    f"📰 {post['title']}\n\n"
-                    f"🔗 {post['link']}\n\n"
+                seen_add(post_id)
+                rss_bot.mark_dirty()
+
+                # Format once and send the same message to every chat
+                message = format_post(post)
+
+                # Send to all registered chat IDs concurrently, the rate
+                # limiter keeps the sends within Telegram's flood limits
+                chat_ids = list(rss_bot.data['chat_ids'])
+                results = await asyncio.gather(
+                    *(send(chat_id=chat_id, text=message) for chat_id in chat_ids),
+                    return_exceptions=True
                 )
+                for chat_id, result in zip(chat_ids, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error sending message to {chat_id}: {result}")
 
-                if post['published']:
-                    message += f"📅 {post['published']}\n\n"
+        rss_bot.commit_feed(feed_url)
 
-                if post['summary']:
-                    # Truncate summary if too long
-                    summary = post['summary'][:500]
-                    if len(post['summary']) > 500:
-                        summary += "..."
-                    message += f"{summary}"
+async def check_feeds_job(context: ContextTypes.DEFAULT_TYPE):
+    """Run the periodic check and schedule the next one
 
-                # Send to all registered chat IDs
-                for chat_id in rss_bot.data['chat_ids']:
-                    try:
-                        await context.bot.send_message(chat_id=chat_id, text=message)
-                    except Exception as e:
-                        logger.error(f"Error sending message to {chat_id}: {e}")
+    Each interval is jittered so checks don't hit feed hosts in lockstep.
+    """
+    try:
+        await check_feeds_periodic(context)
+    finally:
+        delay = CHECK_INTERVAL * random.uniform(1 - CHECK_JITTER, 1 + CHECK_JITTER)
+        context.job_queue.run_once(check_feeds_job, when=delay)
 
-    rss_bot.save_data()
+async def flush_data(context: ContextTypes.DEFAULT_TYPE):
+    """Periodically save pending data changes"""
+    await rss_bot.flush_if_dirty_async()
+
+async def post_init(application: Application):
+    """Set up shared resources once the event loop is running"""
+    await rss_bot.open_session()
+
+async def post_shutdown(application: Application):
+    """Release shared resources on shutdown"""
+    await rss_bot.close_session()
+    rss_bot.flush_if_dirty()
 
 def main():
     """Start the bot"""
     # Create application
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .rate_limiter(AIORateLimiter(overall_max_rate=30, max_retries=3))
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     # Add command handlers
     application.add_handler(CommandHandler("start", start))
@@ -320,7 +710,8 @@ def main():
 
     # Add periodic job to check feeds
     job_queue = application.job_queue
-    job_queue.run_repeating(check_feeds_periodic, interval=CHECK_INTERVAL, first=10)
+    job_queue.run_once(check_feeds_job, when=10)
+    job_queue.run_repeating(flush_data, interval=SAVE_INTERVAL, first=SAVE_INTERVAL)
 
     # Start the bot
     logger.info("Starting RSS Feed Monitor Bot...")